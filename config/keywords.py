@@ -1,4 +1,6 @@
-LANGUAGE_KEYWORDS = {
+from types import MappingProxyType
+
+LANGUAGE_KEYWORDS = MappingProxyType({
     "Python": [
         "and", "as", "assert", "async", "await", "break", "class", "continue",
         "def", "del", "elif", "else", "except", "False", "finally", "for",
@@ -115,5 +117,4 @@ LANGUAGE_KEYWORDS = {
         "USGXT", "USHF", "VABSDIFF", "VABSDIFF4", "VADD", "VMAD", "VMNMX", "VOTE", "VOTEU",
         "VSET", "VSETP", "VSHL", "VSHR", "XMAD"
     ],
-}
-
+})
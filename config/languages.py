@@ -1,11 +1,14 @@
-import sys
+from types import MappingProxyType
 
-LANG_CONFIG = {
+# "runner" is either an argv template tuple, where "{file}" is replaced by the
+# source path and the interpreter is resolved through editor.runner.INTERP_MAP,
+# or the name of a compile/run handler in editor.runner._RUNNERS.
+LANG_CONFIG = MappingProxyType({
     "Python": {
         "ext": ".py",
         "sample": "examples/hello.py",
         "comment": "# ",
-        "runner": lambda f: [sys.executable, str(f)]
+        "runner": ("python", "{file}")
     },
     "Java": {
         "ext": ".java",
@@ -29,7 +32,7 @@ LANG_CONFIG = {
         "ext": ".js",
         "sample": "examples/hello.js",
         "comment": "// ",
-        "runner": lambda f: ["node", str(f)]
+        "runner": ("node", "{file}")
     },
     "TypeScript": {
         "ext": ".ts",
@@ -47,7 +50,7 @@ LANG_CONFIG = {
         "ext": ".go",
         "sample": "examples/hello.go",
         "comment": "// ",
-        "runner": lambda f: ["go", "run", str(f)]
+        "runner": ("go", "run", "{file}")
     },
     "C#": {
         "ext": ".cs",
@@ -59,7 +62,7 @@ LANG_CONFIG = {
         "ext": ".rb",
         "sample": "examples/hello.rb",
         "comment": "# ",
-        "runner": lambda f: ["ruby", str(f)]
+        "runner": ("ruby", "{file}")
     },
     "Kotlin": {
         "ext": ".kt",
@@ -83,7 +86,7 @@ LANG_CONFIG = {
         "ext": ".lua",
         "sample": "examples/hello.lua",
         "comment": "-- ",
-        "runner": lambda f: ["lua", str(f)]
+        "runner": ("lua", "{file}")
     },
     "Nix": {
         "ext": ".nix",
@@ -97,4 +100,4 @@ LANG_CONFIG = {
         "comment": "// ",
         "runner": "ptx"
     }
-}
+})
@@ -1,4 +1,6 @@
-SAMPLE_CODE = {
+from types import MappingProxyType
+
+SAMPLE_CODE = MappingProxyType({
     "Python": """#!/usr/bin/env python3
 \"\"\"
 Simple Python Hello World
@@ -317,4 +319,4 @@ pkgs.mkShell {
         @P0 FADD32I R0, R0, 0;
         @P0 LD.U8 R0, [R0];
 """,
-}
+})
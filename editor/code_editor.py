@@ -1,9 +1,66 @@
 import re
+from collections import Counter
+from itertools import count, islice
 from qt_compat import (
-    QPlainTextEdit, QFont, QCompleter, Qt, QStringListModel, QTextCursor
+    QPlainTextEdit, QFont, QFontDatabase, QCompleter, Qt, QStringListModel, QTextBlockUserData,
+    QTextCursor, QTimer, Slot
 )
 from .highlighter import SyntaxHighlighter
 from config.keywords import LANGUAGE_KEYWORDS
+from utils.word_trie import WordTrie, merge_prefix
+
+WORD_PATTERN = re.compile(r'\b[A-Za-z_][A-Za-z0-9_]{2,}\b', re.ASCII)
+
+# The popup is a top-level window, so the main window stylesheet doesn't reach it
+COMPLETER_QSS = """
+    QListView {
+        background-color: #f5ebe0;
+        color: #704241;
+        border: 2px solid #d5bdaf;
+        border-radius: 6px;
+        padding: 4px;
+        selection-background-color: #e3d5ca;
+    }
+"""
+
+# Completion popup shows at most this many candidates
+MAX_COMPLETIONS = 50
+
+EDITOR_FONT_CANDIDATES = ("JetBrains Mono", "Fira Code", "Consolas")
+
+_editor_font_family = None
+
+
+def editor_font_family():
+    """Return the first installed editor font, querying the font database once.
+
+    Resolved lazily because QFontDatabase needs a running QApplication.
+    """
+    global _editor_font_family
+    if _editor_font_family is None:
+        families = set(QFontDatabase.families())
+        _editor_font_family = next((f for f in EDITOR_FONT_CANDIDATES if f in families), "Monospace")
+    return _editor_font_family
+
+
+# Keyword tries are identical for every editor of a language
+_KEYWORD_TRIES = {}
+
+
+def keyword_trie(language):
+    trie = _KEYWORD_TRIES.get(language)
+    if trie is None:
+        trie = _KEYWORD_TRIES[language] = WordTrie(LANGUAGE_KEYWORDS.get(language, []))
+    return trie
+
+
+class _BlockKey(QTextBlockUserData):
+    """Stable identity of a block; user data moves with the block as lines shift."""
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
 
 class CodeEditor(QPlainTextEdit):
     """Enhanced code editor with syntax highlighting and autocompletion"""
@@ -16,52 +73,181 @@ class CodeEditor(QPlainTextEdit):
         self.highlighter = SyntaxHighlighter(self.document(), language)
 
     def setup_editor(self):
-        font = QFont("JetBrains Mono", 11)
-        if not font.exactMatch():
-            font = QFont("Fira Code", 11)
-        if not font.exactMatch():
-            font = QFont("Consolas", 11)
+        font = QFont(editor_font_family(), 11)
         font.setStyleHint(QFont.StyleHint.Monospace)
         self.setFont(font)
-        self.setStyleSheet("""
-            QPlainTextEdit {
-                background-color: #f5ebe0;
-                color: #704241;
-                selection-background-color: #e3d5ca;
-                border: none;
-                padding: 8px;
-            }
-        """)
-        self.setTabStopDistance(self.fontMetrics().horizontalAdvance(' ') * 4)
+        # Styled by the window stylesheet (ui.app_window.MOCHA_QSS)
+        self.setObjectName("codeEditor")
+        # Without wrapping, block layout no longer depends on the viewport
+        # width, so resizes and edits don't re-wrap the document.
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setCenterOnScroll(False)
+        self._space_advance = self.fontMetrics().horizontalAdvance(' ')
+        self.setTabStopDistance(self._space_advance * 4)
+
+        # Re-check the document size shortly after edits settle rather than on
+        # every keystroke; the highlighter is detached above its size limit.
+        self._size_check_timer = QTimer(self)
+        self._size_check_timer.setSingleShot(True)
+        self._size_check_timer.setInterval(300)
+        self._size_check_timer.timeout.connect(self.check_highlight_size)
+        self.document().contentsChange.connect(lambda *_: self._size_check_timer.start())
+
+    @Slot()
+    def check_highlight_size(self, report=False):
+        """Detach or re-attach the highlighter for the current document size.
+
+        With `report`, a document that is already detached and still too
+        large is reported too, e.g. after a streamed load detached it by hand.
+        """
+        doc = self.document()
+        too_large = doc.characterCount() > self.highlighter.size_limit
+        attached = self.highlighter.document() is not None
+        if too_large and (attached or report):
+            if attached:
+                self.highlighter.setDocument(None)
+            self.show_status("Syntax highlighting disabled for large file")
+        elif not too_large and not attached:
+            self.highlighter.setDocument(doc)
+            self.show_status("Syntax highlighting re-enabled")
+
+    def show_status(self, message):
+        window = self.window()
+        if hasattr(window, "statusBar"):
+            window.statusBar().showMessage(message)
 
     def setup_autocomplete(self):
-        self.completer = QCompleter()
+        self._completion_model = QStringListModel(self)
+        self.completer = QCompleter(self._completion_model, self)
         self.completer.setWidget(self)
         self.completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
         self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
 
-        self.completer.popup().setStyleSheet("""
-            QListView {
-                background-color: #f5ebe0;
-                color: #704241;
-                border: 2px solid #d5bdaf;
-                border-radius: 6px;
-                padding: 4px;
-                font-family: 'JetBrains Mono', 'Consolas', monospace;
-                selection-background-color: #e3d5ca;
-            }
-        """)
+        self.completer.popup().setStyleSheet(COMPLETER_QSS)
+        self.completer.popup().setFont(self.font())
         self.completer.activated.connect(self.insert_completion)
-        self.update_completer_model()
 
-    def update_completer_model(self):
-        keywords = LANGUAGE_KEYWORDS.get(self.language, [])
-        text = self.toPlainText()
-        words = set(re.findall(r'\b[A-Za-z_][A-Za-z0-9_]{2,}\b', text))
-        all_completions = sorted(set(keywords) | words)
-        model = QStringListModel(all_completions)
-        self.completer.setModel(model)
+        # Coalesce bursts of typing into one completion lookup
+        self._completer_timer = QTimer(self)
+        self._completer_timer.setSingleShot(True)
+        self._completer_timer.setInterval(80)
+        self._completer_timer.timeout.connect(self._refresh_completer)
+
+        # Document words are tracked per block and only rescanned for the
+        # blocks touched by an edit; _doc_words counts the blocks using a word
+        # and _word_trie holds every word with a non-zero count.
+        self._keyword_trie = keyword_trie(self.language)
+        self._last_prefix = None
+        self._last_completions = None
+        # Each block carries a _BlockKey; _block_info maps it to
+        # [words, key of the next block]. The links let an edit find the words
+        # of blocks Qt has already deleted, without renumbering anything.
+        self._block_keys = count()
+        self._rebuild_block_words()
+        self.document().contentsChange.connect(self._on_contents_change)
+
+    def _rebuild_block_words(self):
+        self._doc_words = Counter()
+        self._block_info = {}
+        previous = None
+        block = self.document().firstBlock()
+        while block.isValid():
+            key = next(self._block_keys)
+            block.setUserData(_BlockKey(key))
+            words = set(WORD_PATTERN.findall(block.text()))
+            self._block_info[key] = [words, None]
+            self._doc_words.update(words)
+            if previous is not None:
+                self._block_info[previous][1] = key
+            previous = key
+            block = block.next()
+        self._word_trie = WordTrie(self._doc_words)
+
+    @staticmethod
+    def _key_of(block):
+        data = block.userData()
+        return data.key if isinstance(data, _BlockKey) else None
+
+    def _replaced_keys(self, first_key, after_key):
+        """Keys of the blocks an edit replaced, or None if the links are broken.
+
+        Qt keeps the user data of the block an edit starts in (splits leave
+        it on the upper part, merges on the earlier block), so following the
+        links from it up to the first untouched block visits exactly the
+        blocks the edit rewrote or deleted.
+        """
+        keys = []
+        key = first_key
+        while key != after_key:
+            info = self._block_info.get(key)
+            if info is None or len(keys) >= len(self._block_info):
+                return None
+            keys.append(key)
+            key = info[1]
+        return keys or None
+
+    @Slot(int, int, int)
+    def _on_contents_change(self, position, removed, added):
+        doc = self.document()
+        first = doc.findBlock(position)
+        last = doc.findBlock(position + added)
+        if not last.isValid():
+            last = doc.lastBlock()
+        after = last.next()
+        after_key = self._key_of(after) if after.isValid() else None
+
+        first_key = self._key_of(first)
+        old_keys = self._replaced_keys(first_key, after_key)
+        if old_keys is None or (after.isValid() and after_key is None):
+            # Links out of step with the document, e.g. after setPlainText
+            self._rebuild_block_words()
+            return
+
+        stale = set()
+        for key in old_keys:
+            words = self._block_info.pop(key)[0]
+            self._doc_words.subtract(words)
+            stale.update(words)
+
+        block = first
+        key = first_key
+        while True:
+            words = set(WORD_PATTERN.findall(block.text()))
+            for word in words:
+                if self._doc_words[word] <= 0:
+                    self._word_trie.insert(word)
+            self._doc_words.update(words)
+            if block == last:
+                self._block_info[key] = [words, after_key]
+                break
+            block = block.next()
+            next_key = next(self._block_keys)
+            block.setUserData(_BlockKey(next_key))
+            self._block_info[key] = [words, next_key]
+            key = next_key
+
+        for word in stale:
+            if self._doc_words[word] <= 0:
+                del self._doc_words[word]
+                self._word_trie.remove(word)
 
+    def update_completer_model(self, prefix):
+        lowered = prefix.lower()
+        previous = self._last_completions
+        if (self._last_prefix is not None and lowered.startswith(self._last_prefix)
+                and previous is not None and len(previous) < MAX_COMPLETIONS):
+            # Extending the previous prefix can only narrow a complete result
+            # list, so trim it instead of walking the tries again.
+            matches = [word for word in previous if word.lower().startswith(lowered)]
+        else:
+            matches = list(islice(merge_prefix((self._keyword_trie, self._word_trie), prefix), MAX_COMPLETIONS))
+        self._last_prefix = lowered
+        # Only touch the model when the candidates actually changed
+        if matches != self._last_completions:
+            self._last_completions = matches
+            self._completion_model.setStringList(matches)
+
+    @Slot(str)
     def insert_completion(self, completion):
         cursor = self.textCursor()
         prefix = self.completer.completionPrefix()
@@ -108,18 +294,30 @@ class CodeEditor(QPlainTextEdit):
         # Show completer when appropriate
         completion_prefix = self.text_under_cursor()
         if event.key() == Qt.Key.Key_Space and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
-            self.update_completer_model()
+            self.update_completer_model("")
             self.completer.setCompletionPrefix("")
             rect = self.cursorRect()
             self.completer.complete(rect)
         elif len(completion_prefix) >= 2 and event.text().isalnum():
-            self.update_completer_model()
-            self.completer.setCompletionPrefix(completion_prefix)
-            if self.completer.completionCount() > 0:
-                rect = self.cursorRect()
-                self.completer.complete(rect)
+            self._completer_timer.start()
+        else:
+            # The word being completed was interrupted; start afresh next time
+            self._completer_timer.stop()
+            self._last_prefix = None
+
+    @Slot()
+    def _refresh_completer(self):
+        completion_prefix = self.text_under_cursor()
+        if len(completion_prefix) < 2:
+            return
+        self.update_completer_model(completion_prefix)
+        self.completer.setCompletionPrefix(completion_prefix)
+        if self.completer.completionCount() > 0:
+            rect = self.cursorRect()
+            self.completer.complete(rect)
 
     def set_language(self, language):
         self.language = language
         self.highlighter.set_language(language)
-        self.update_completer_model()
+        self._keyword_trie = keyword_trie(language)
+        self._last_prefix = None
@@ -1,18 +1,69 @@
+import codecs
+import io
+import mmap
 from pathlib import Path
-from qt_compat import QVBoxLayout, QWidget, QLabel, QMessageBox
+from qt_compat import QVBoxLayout, QWidget, QLabel, QMessageBox, QThread, Signal, Slot, QTextCursor
 from .code_editor import CodeEditor
+from config.languages import LANG_CONFIG
 from config.samples import SAMPLE_CODE
 
+# Files larger than this are decoded on a worker thread and streamed in
+STREAM_THRESHOLD = 1 << 20
+
+
+class FileLoaderThread(QThread):
+    """Thread decoding a file in chunks so large files open without blocking UI"""
+    chunkRead = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, filepath, chunk_size=1 << 20):
+        super().__init__()
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+
+    def run(self):
+        try:
+            with open(self.filepath, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Same decoding as text-mode open(): UTF-8 with universal newlines
+                decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+                for offset in range(0, len(data), self.chunk_size):
+                    text = decoder.decode(data[offset:offset + self.chunk_size])
+                    if text:
+                        self.chunkRead.emit(text)
+                text = decoder.decode(b'', final=True)
+                if text:
+                    self.chunkRead.emit(text)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class EditorTab(QWidget):
     """Individual editor tab"""
 
     def __init__(self, language="Python", filepath=None):
         super().__init__()
-        self.language = language
+        self._set_config(language)
         self.filepath = Path(filepath) if filepath else None
+        self._loader = None
+        # Set while a streamed load is in progress, until _load_finished runs
+        self._load_cursor = None
+        # Set when a streamed load failed; the editor then only holds part of the file
+        self._load_error = None
         self.setup_ui()
         self.load_content()
 
+    def _set_config(self, language):
+        # Snapshot the language's settings so save/run don't look them up again
+        self.language = language
+        self._config = LANG_CONFIG.get(language, {})
+        self.ext = self._config.get("ext", "")
+        self.runner = self._config.get("runner")
+
+    def set_language(self, language):
+        self._set_config(language)
+        self.editor.set_language(language)
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
         self.editor = CodeEditor(language=self.language)
@@ -20,24 +71,81 @@ class EditorTab(QWidget):
 
     def load_content(self):
         if self.filepath and self.filepath.exists():
+            if self.filepath.stat().st_size > STREAM_THRESHOLD:
+                self.stream_content()
+                return
             with open(self.filepath, 'r', encoding='utf-8') as f:
                 self.editor.setPlainText(f.read())
         else:
             self.editor.setPlainText(SAMPLE_CODE.get(self.language, ""))
 
+    def stream_content(self):
+        """Fill the editor from a FileLoaderThread, one chunk at a time."""
+        editor = self.editor
+        editor.clear()
+        editor.setReadOnly(True)
+        # Highlighting and undo history are pointless while chunks arrive
+        editor.highlighter.setDocument(None)
+        editor.document().setUndoRedoEnabled(False)
+
+        self._load_cursor = QTextCursor(editor.document())
+        self._loader = FileLoaderThread(self.filepath)
+        self._loader.chunkRead.connect(self._append_chunk)
+        self._loader.failed.connect(self._load_failed)
+        self._loader.finished.connect(self._load_finished)
+        self._loader.start()
+
+    def is_loading(self):
+        # Not the thread state: the last chunks and `finished` may still be
+        # queued on the GUI thread after run() has returned.
+        return self._load_cursor is not None
+
+    @Slot(str)
+    def _append_chunk(self, text):
+        self._load_cursor.movePosition(QTextCursor.MoveOperation.End)
+        self._load_cursor.insertText(text)
+
+    @Slot(str)
+    def _load_failed(self, message):
+        # save() refuses from now on, so the partial text never overwrites the file
+        self._load_error = message
+        QMessageBox.critical(self, "Open Error", f"Failed to open file:\n{message}")
+
+    @Slot()
+    def _load_finished(self):
+        self._load_cursor = None
+        if self._load_error is not None:
+            # Leave the partial content read-only
+            return
+        editor = self.editor
+        editor.document().setUndoRedoEnabled(True)
+        editor.document().setModified(False)
+        editor.setReadOnly(False)
+        editor.moveCursor(QTextCursor.MoveOperation.Start)
+        # Re-attaches the highlighter unless the file is over its size limit,
+        # in which case the status bar says highlighting is off
+        editor.check_highlight_size(report=True)
+
     def get_content(self):
         return self.editor.toPlainText()
 
     def save(self, filepath=None):
-        if filepath:
-            self.filepath = Path(filepath)
-        if not self.filepath:
+        if self._load_error is not None:
+            QMessageBox.warning(self, "Save Error", "File failed to load completely; only part of it is shown.")
+            return False
+        if self.is_loading():
+            QMessageBox.warning(self, "Save Error", "File is still loading; try again once it has finished.")
+            return False
+        # Only adopt a new path once the file was written to it
+        target = Path(filepath) if filepath else self.filepath
+        if not target:
             return False
         # Ensure extension
         # Language config is used by app_window when saving to propose extension; here keep simple
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
+            with open(target, 'w', encoding='utf-8') as f:
                 f.write(self.get_content())
+            self.filepath = target
             return True
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{str(e)}")
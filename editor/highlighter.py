@@ -1,73 +1,168 @@
-import re
-from qt_compat import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
+import multiprocessing
+import os
+from collections import OrderedDict
+from types import MappingProxyType
+from qt_compat import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QTimer, Signal, Slot
+
+from utils.highlight_rules import compute_ranges, highlight_batch
+
+
+# (language, block text) -> [(start, length, kind), ...], shared across
+# highlighters so unchanged or repeated lines skip the regex pass entirely.
+# Sized well above ASYNC_BLOCK_THRESHOLD so a full rehighlight of a document
+# that used the pool is served from the cache.
+_HIGHLIGHT_CACHE = OrderedDict()
+_HIGHLIGHT_CACHE_SIZE = 1 << 16
+
+
+def _cache_ranges(key, ranges):
+    _HIGHLIGHT_CACHE[key] = ranges
+    if len(_HIGHLIGHT_CACHE) > _HIGHLIGHT_CACHE_SIZE:
+        _HIGHLIGHT_CACHE.popitem(last=False)
+
+
+# Formats (Mocha-ish) are identical for every highlighter, so build them once
+def _char_format(color, bold=False, italic=False):
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    if bold:
+        fmt.setFontWeight(QFont.Weight.Bold)
+    if italic:
+        fmt.setFontItalic(True)
+    return fmt
+
+
+KEYWORD_FMT = _char_format("#8b4513", bold=True)
+STRING_FMT = _char_format("#6b8e23")
+NUMBER_FMT = _char_format("#cd853f")
+FUNCTION_FMT = _char_format("#704241", italic=True)
+COMMENT_FMT = _char_format("#a0826d", italic=True)
+
+FORMAT_BY_KIND = MappingProxyType({
+    "keyword": KEYWORD_FMT,
+    "string": STRING_FMT,
+    "number": NUMBER_FMT,
+    "function": FUNCTION_FMT,
+    "comment": COMMENT_FMT,
+})
+
+
+# Documents with more blocks than this are highlighted by worker processes
+ASYNC_BLOCK_THRESHOLD = 5000
+
+# Cache misses highlighted in place per event-loop pass before the rest are
+# deferred. Qt reformats an edited block first, so edits never wait on a
+# worker; bulk passes (load, paste, language switch) still paint the top of
+# the document immediately.
+SYNC_BLOCKS_PER_PASS = 64
+
+# Blocks per worker task; one task per block costs more to submit than the
+# regex pass it saves.
+_BATCH_SIZE = 1000
+_MAX_WORKERS = 4
+
+_highlight_pool = None
+
+
+def highlight_pool():
+    """Return the shared highlighting process pool, or None if unavailable."""
+    global _highlight_pool
+    if _highlight_pool is None:
+        try:
+            # spawn rather than fork: forking a running Qt application is unsafe
+            context = multiprocessing.get_context("spawn")
+            processes = min(_MAX_WORKERS, max(1, (os.cpu_count() or 2) - 1))
+            _highlight_pool = context.Pool(processes=processes)
+        except (OSError, ValueError):
+            _highlight_pool = False
+    return _highlight_pool or None
 
-from config.keywords import LANGUAGE_KEYWORDS
 
 class SyntaxHighlighter(QSyntaxHighlighter):
     """Syntax highlighter for multiple languages"""
+    # Emitted from the pool's result thread; delivered queued on the GUI thread
+    rangesReady = Signal(object, object)
+
     def __init__(self, parent, language="Python"):
         super().__init__(parent)
         self.language = language
-        self.setup_rules()
-
-    def setup_rules(self):
-        self.rules = []
-
-        # Colors (Mocha-ish)
-        keyword_color = QColor("#8b4513")
-        string_color = QColor("#6b8e23")
-        comment_color = QColor("#a0826d")
-        number_color = QColor("#cd853f")
-        function_color = QColor("#704241")
-
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(keyword_color)
-        keyword_format.setFontWeight(QFont.Weight.Bold)
-
-        keywords = LANGUAGE_KEYWORDS.get(self.language, [])
-        for word in keywords:
-            pattern = rf"\b{re.escape(word)}\b"
-            self.rules.append((re.compile(pattern), keyword_format))
-
-        string_format = QTextCharFormat()
-        string_format.setForeground(string_color)
-        self.rules.append((re.compile(r'"[^"\\]*(\\.[^"\\]*)*"'), string_format))
-        self.rules.append((re.compile(r"'[^'\\]*(\\.[^'\\]*)*'"), string_format))
-
-        number_format = QTextCharFormat()
-        number_format.setForeground(number_color)
-        self.rules.append((re.compile(r'\b\d+\.?\d*\b'), number_format))
-
-        function_format = QTextCharFormat()
-        function_format.setForeground(function_color)
-        function_format.setFontItalic(True)
-        self.rules.append((re.compile(r'\b[A-Za-z_][A-Za-z0-9_]*(?=\()'), function_format))
-
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(comment_color)
-        comment_format.setFontItalic(True)
-
-        if self.language in ["Python", "Ruby", "Nix"]:
-            self.rules.append((re.compile(r'#[^\n]*'), comment_format))
-        elif self.language == "Lua":
-            self.rules.append((re.compile(r'--[^\n]*'), comment_format))
-        elif self.language in ["C", "C++", "Java", "JavaScript", "TypeScript",
-                               "Rust", "Go", "C#", "Kotlin"]:
-            self.rules.append((re.compile(r'//[^\n]*'), comment_format))
-            self.rules.append((re.compile(r'/\*.*?\*/', re.DOTALL), comment_format))
-        elif self.language == "HTML":
-            self.rules.append((re.compile(r'<!--.*?-->', re.DOTALL), comment_format))
-        elif self.language == "CSS":
-            self.rules.append((re.compile(r'/\*.*?\*/', re.DOTALL), comment_format))
+        # Above this many characters highlighting is skipped entirely;
+        # QSyntaxHighlighter degrades badly on multi-megabyte documents.
+        self.size_limit = 512 * 1024
+        # (language, text) -> blocks waiting on a worker result
+        self._pending = {}
+        # Keys deferred during the current pass, submitted once it ends
+        self._queued = []
+        self._pass_misses = 0
+        self.rangesReady.connect(self._apply_async_ranges)
 
     def highlightBlock(self, text):
-        for pattern, fmt in self.rules:
-            for m in pattern.finditer(text):
-                start = m.start()
-                length = m.end() - start
-                self.setFormat(start, length, fmt)
+        if not text.strip():
+            return
+        if self.document().characterCount() > self.size_limit:
+            return
+
+        key = (self.language, text)
+        ranges = _HIGHLIGHT_CACHE.get(key)
+        if ranges is None:
+            if self._defer(key):
+                return
+            ranges = compute_ranges(self.language, text)
+            _cache_ranges(key, ranges)
+        else:
+            _HIGHLIGHT_CACHE.move_to_end(key)
+
+        for start, length, kind in ranges:
+            self.setFormat(start, length, FORMAT_BY_KIND[kind])
+
+    def _defer(self, key):
+        """Queue a missed block for the pool; False if it should be highlighted now."""
+        if self.document().blockCount() <= ASYNC_BLOCK_THRESHOLD:
+            return False
+        self._pass_misses += 1
+        if self._pass_misses == 1:
+            QTimer.singleShot(0, self._end_pass)
+        if self._pass_misses <= SYNC_BLOCKS_PER_PASS or highlight_pool() is None:
+            return False
+
+        block = self.currentBlock()
+        waiting = self._pending.get(key)
+        if waiting is None:
+            self._pending[key] = [block]
+            self._queued.append(key)
+        else:
+            waiting.append(block)
+        return True
+
+    @Slot()
+    def _end_pass(self):
+        self._pass_misses = 0
+        queued, self._queued = self._queued, []
+        pool = highlight_pool()
+        for i in range(0, len(queued), _BATCH_SIZE):
+            self._submit(pool, queued[i:i + _BATCH_SIZE])
+
+    def _submit(self, pool, keys):
+        def deliver(results):
+            try:
+                self.rangesReady.emit(keys, results)
+            except RuntimeError:
+                # Highlighter was deleted while the batch was in flight
+                pass
+
+        pool.apply_async(highlight_batch, (keys,), callback=deliver,
+                         error_callback=lambda _exc: deliver(None))
+
+    @Slot(object, object)
+    def _apply_async_ranges(self, keys, results):
+        if results is None:
+            results = highlight_batch(keys)
+        for key, ranges in zip(keys, results):
+            _cache_ranges(key, ranges)
+            for block in self._pending.pop(key, ()):
+                if block.isValid() and block.text() == key[1]:
+                    self.rehighlightBlock(block)
 
     def set_language(self, language):
         self.language = language
-        self.setup_rules()
         self.rehighlight()
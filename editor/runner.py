@@ -1,148 +1,317 @@
+import codecs
+import functools
+import io
+import locale
+import os
+import selectors
+import shutil
 import subprocess
+import sys
+import time
 import webbrowser
 from pathlib import Path
+from types import MappingProxyType
 from qt_compat import QThread, Signal
 
 from config.languages import LANG_CONFIG
 
+RUN_TIMEOUT = 60
+
+# Runner output is batched into one signal per ~frame or per 64 KiB
+FLUSH_INTERVAL = 0.016
+FLUSH_SIZE = 64 * 1024
+
+FILE_TOKEN = "{file}"
+
+
+@functools.lru_cache(maxsize=None)
+def _which(tool):
+    """shutil.which, memoized for the session; see refresh_tool_paths."""
+    return shutil.which(tool)
+
+
+def _resolve_interpreter(name):
+    if name == "python":
+        return sys.executable
+    # Keep the bare name when missing so Popen reports it as not found
+    return _which(name) or name
+
+
+# Interpreter token -> executable path, resolved once per session
+INTERP_MAP = {}
+
+
+def refresh_tool_paths():
+    """Forget cached tool lookups, e.g. after installing a compiler mid-session."""
+    _which.cache_clear()
+    INTERP_MAP.clear()
+    for cfg in LANG_CONFIG.values():
+        if isinstance(cfg.get("runner"), tuple):
+            token = cfg["runner"][0]
+            INTERP_MAP[token] = _resolve_interpreter(token)
+
+
+refresh_tool_paths()
+
+
+def build_argv(language, filepath):
+    """Expand a language's argv template for the given source file."""
+    template = LANG_CONFIG[language]["runner"]
+    path = os.fspath(filepath)
+    return [path if token == FILE_TOKEN else INTERP_MAP.get(token, token) for token in template]
+
+
 class RunnerThread(QThread):
-    """Thread for running code without blocking UI"""
+    """Thread for building and running code without blocking UI
+
+    `stages` run in order in `cwd`; every stage but the last is a build step
+    and a non-zero exit aborts the run. A stage is an argv list, or a
+    callable for steps that aren't processes (e.g. opening a browser).
+    """
     output = Signal(str)
     finished = Signal()
 
-    def __init__(self, command, cwd):
+    def __init__(self, stages, cwd):
         super().__init__()
-        self.command = command
+        self.stages = stages
         self.cwd = cwd
 
     def run(self):
         try:
-            process = subprocess.Popen(
-                self.command,
-                cwd=self.cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            stdout, stderr = process.communicate(timeout=60)
-
-            if stdout:
-                self.output.emit(stdout)
-            if stderr:
-                self.output.emit(stderr)
+            *build_stages, final_stage = self.stages
+            for stage in build_stages:
+                returncode = self._run_stage(stage, timeout=None)
+                if returncode != 0:
+                    self.output.emit(f"\n[Compilation failed with exit code {returncode}]\n")
+                    return
+            self._run_stage(final_stage, timeout=RUN_TIMEOUT)
 
         except subprocess.TimeoutExpired:
-            self.output.emit("\n[Execution timeout after 60 seconds]\n")
+            self.output.emit(f"\n[Execution timeout after {RUN_TIMEOUT} seconds]\n")
         except Exception as e:
             self.output.emit(f"\n[Error: {str(e)}]\n")
         finally:
             self.finished.emit()
 
+    def _run_stage(self, stage, timeout):
+        if callable(stage):
+            stage()
+            return 0
 
-def get_run_command(filepath: Path, language: str, runner):
-    """
-    Return a list command to run the file or None if not available.
-    This mirrors the logic from original single-file implementation,
-    but simplified and centralized here.
-    """
-    if callable(runner):
-        return runner(filepath)
+        process = subprocess.Popen(
+            stage,
+            cwd=self.cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        try:
+            if os.name == "posix":
+                self._stream(process, timeout)
+            else:
+                # selectors cannot poll pipes on Windows
+                self._communicate(process, timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        return process.returncode
 
-    if runner == "browser":
-        webbrowser.open(str(filepath.resolve().as_uri()))
-        return None
+    def _stream(self, process, timeout):
+        """Emit stdout/stderr as the child writes it, batched per frame.
 
-    # Java
-    if runner == "java":
-        try:
-            subprocess.run(["javac", str(filepath)], check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("Java compiler (javac) not found in PATH")
-        return ["java", filepath.stem]
-
-    # C
-    if runner == "c":
-        exe = filepath.with_suffix(".out")
-        try:
-            subprocess.run(["gcc", str(filepath), "-o", str(exe)], check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("C compiler (gcc) not found in PATH")
-        return [str(exe)]
-
-    # C++
-    if runner == "cpp":
-        exe = filepath.with_suffix(".out")
-        try:
-            subprocess.run(["g++", str(filepath), "-o", str(exe)], check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("C++ compiler (g++) not found in PATH")
-        return [str(exe)]
-
-    # Rust
-    if runner == "rust":
-        exe = filepath.with_suffix(".out")
-        try:
-            subprocess.run(["rustc", str(filepath), "-o", str(exe)], check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("Rust compiler (rustc) not found in PATH")
-        return [str(exe)]
-
-    # TypeScript
-    if runner == "typescript":
-        js_file = filepath.with_suffix(".js")
-        try:
-            subprocess.run(["tsc", str(filepath)], check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("TypeScript compiler (tsc) not found in PATH")
-        # run with node
-        try:
-            subprocess.run(["node", "--version"], check=True, capture_output=True)
-            return ["node", str(js_file)]
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            webbrowser.open(str(js_file.resolve().as_uri()))
-            return None
-
-    # Kotlin
-    if runner == "kotlin":
-        jar_file = filepath.parent / "output.jar"
-        try:
-            subprocess.run(["kotlinc", str(filepath), "-include-runtime", "-d", str(jar_file)],
-                           check=True, cwd=str(filepath.parent), capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Compilation failed:\n{e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("Kotlin compiler (kotlinc) not found in PATH")
-        return ["java", "-jar", str(jar_file)]
-
-    # C#
-    if runner == "csharp":
-        try:
-            subprocess.run(["dotnet", "--version"], check=True, capture_output=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError(".NET SDK not found in PATH")
-        return ["dotnet", "run"]
+        Chunks are coalesced for up to FLUSH_INTERVAL seconds (or
+        FLUSH_SIZE characters) so chatty programs cost one console update
+        per batch rather than one per read.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        encoding = locale.getpreferredencoding(False)
+        buffer = []
+        buffered = 0
+        next_flush = time.monotonic()
+        with selectors.DefaultSelector() as selector:
+            for pipe in (process.stdout, process.stderr):
+                os.set_blocking(pipe.fileno(), False)
+                decoder = io.IncrementalNewlineDecoder(
+                    codecs.getincrementaldecoder(encoding)(errors="replace"), translate=True
+                )
+                selector.register(pipe, selectors.EVENT_READ, decoder)
+
+            try:
+                while selector.get_map():
+                    now = time.monotonic()
+                    wait = max(0, next_flush - now) if buffer else None
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise subprocess.TimeoutExpired(process.args, timeout)
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    for key, _ in selector.select(wait):
+                        chunk = os.read(key.fd, 4096)
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()
+                        text = key.data.decode(chunk, final=not chunk)
+                        if text:
+                            buffer.append(text)
+                            buffered += len(text)
+
+                    now = time.monotonic()
+                    if buffer and (buffered >= FLUSH_SIZE or now >= next_flush):
+                        self.output.emit("".join(buffer))
+                        buffer.clear()
+                        buffered = 0
+                        next_flush = now + FLUSH_INTERVAL
+            finally:
+                if buffer:
+                    self.output.emit("".join(buffer))
+
+        process.wait(timeout=None if deadline is None else max(0, deadline - time.monotonic()))
+
+    def _communicate(self, process, timeout):
+        stdout, stderr = process.communicate(timeout=timeout)
+        encoding = locale.getpreferredencoding(False)
+        for data in (stdout, stderr):
+            if data:
+                text = data.decode(encoding, errors="replace")
+                self.output.emit(text.replace("\r\n", "\n"))
 
-    # Nix
-    if runner == "nix":
+
+def _require(tool, message):
+    if _which(tool) is None:
+        raise RuntimeError(message)
+
+
+# Source path -> (source mtime, artifact path, artifact mtime) of its last successful build
+_build_cache = {}
+
+
+def _record_build(source, source_mtime, artifact):
+    try:
+        _build_cache[source] = (source_mtime, artifact, artifact.stat().st_mtime_ns)
+    except OSError:
+        _build_cache.pop(source, None)
+
+
+def forget_build(source):
+    """Drop the cached build of a source file, e.g. after it was saved."""
+    _build_cache.pop(source, None)
+
+
+def _compile_and_run(source, artifact, compile_argv, run_argv, tool, message):
+    """Stages for the common compile-then-run pattern, checking the compiler first.
+
+    The compile stage is skipped while the source is unchanged since its last
+    successful build and the artifact is still the one that build produced.
+    """
+    try:
+        source_mtime = source.stat().st_mtime_ns
+    except OSError:
+        source_mtime = None
+    cached = _build_cache.get(source)
+    if cached is not None and source_mtime is not None and cached[0] == source_mtime:
+        _, cached_artifact, artifact_mtime = cached
         try:
-            subprocess.run(["nix", "--version"], check=True, capture_output=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            raise RuntimeError("Nix not found in PATH")
-        if filepath.name == "flake.nix":
-            return ["nix", "develop", "."]
-        else:
-            return ["nix-shell", str(filepath)]
-
-    # Fallback: interpreter names in LANG_CONFIG could be lambdas handled above
+            if cached_artifact.stat().st_mtime_ns == artifact_mtime:
+                return [run_argv]
+        except OSError:
+            pass
+        forget_build(source)
+
+    _require(tool, message)
+    # Build stages only run after the previous one succeeded, so this
+    # records exactly the builds that completed.
+    record = functools.partial(_record_build, source, source_mtime, artifact)
+    return [compile_argv, record, run_argv]
+
+
+def _run_java(filepath: Path):
+    return _compile_and_run(filepath, filepath.with_suffix(".class"),
+                            ["javac", os.fspath(filepath)], ["java", filepath.stem],
+                            "javac", "Java compiler (javac) not found in PATH")
+
+
+def _run_c(filepath: Path):
+    exe = filepath.with_suffix(".out")
+    src, out = os.fspath(filepath), os.fspath(exe)
+    return _compile_and_run(filepath, exe, ["gcc", src, "-o", out], [out],
+                            "gcc", "C compiler (gcc) not found in PATH")
+
+
+def _run_cpp(filepath: Path):
+    exe = filepath.with_suffix(".out")
+    src, out = os.fspath(filepath), os.fspath(exe)
+    return _compile_and_run(filepath, exe, ["g++", src, "-o", out], [out],
+                            "g++", "C++ compiler (g++) not found in PATH")
+
+
+def _run_rust(filepath: Path):
+    exe = filepath.with_suffix(".out")
+    src, out = os.fspath(filepath), os.fspath(exe)
+    return _compile_and_run(filepath, exe, ["rustc", src, "-o", out], [out],
+                            "rustc", "Rust compiler (rustc) not found in PATH")
+
+
+def _run_typescript(filepath: Path):
+    js_file = filepath.with_suffix(".js")
+    # run with node, or fall back to the browser
+    if _which("node") is not None:
+        run_stage = ["node", os.fspath(js_file)]
+    else:
+        run_stage = functools.partial(webbrowser.open, js_file.resolve().as_uri())
+    return _compile_and_run(filepath, js_file, ["tsc", os.fspath(filepath)], run_stage,
+                            "tsc", "TypeScript compiler (tsc) not found in PATH")
+
+
+def _run_kotlin(filepath: Path):
+    jar_file = filepath.parent / "output.jar"
+    jar = os.fspath(jar_file)
+    return _compile_and_run(filepath, jar_file,
+                            ["kotlinc", os.fspath(filepath), "-include-runtime", "-d", jar],
+                            ["java", "-jar", jar],
+                            "kotlinc", "Kotlin compiler (kotlinc) not found in PATH")
+
+
+def _run_csharp(filepath: Path):
+    _require("dotnet", ".NET SDK not found in PATH")
+    return [["dotnet", "run"]]
+
+
+def _run_nix(filepath: Path):
+    _require("nix", "Nix not found in PATH")
+    if filepath.name == "flake.nix":
+        return [["nix", "develop", "."]]
+    return [["nix-shell", os.fspath(filepath)]]
+
+
+def _open_in_browser(filepath: Path):
+    webbrowser.open(filepath.resolve().as_uri())
     return None
+
+
+# Handler name (LANG_CONFIG "runner") -> function returning the stages for a file
+_RUNNERS = MappingProxyType({
+    "java": _run_java,
+    "c": _run_c,
+    "cpp": _run_cpp,
+    "rust": _run_rust,
+    "typescript": _run_typescript,
+    "kotlin": _run_kotlin,
+    "csharp": _run_csharp,
+    "nix": _run_nix,
+    "browser": _open_in_browser,
+})
+
+
+def get_run_command(filepath: Path, language: str, runner):
+    """
+    Return the stages that build and run the file, or None if nothing needs running.
+    Stages are executed by RunnerThread; nothing is compiled here, so the
+    GUI thread only pays for cached PATH lookups. Raises RuntimeError when a
+    required tool is missing.
+    """
+    if isinstance(runner, tuple):
+        return [build_argv(language, filepath)]
+
+    handler = _RUNNERS.get(runner)
+    return handler(filepath) if handler else None
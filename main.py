@@ -1,16 +1,19 @@
 from pathlib import Path
+import multiprocessing
 import sys
 
-from qt_compat import QApplication, USING_PYQT
-
 # Ensure Python path includes project root so relative imports work when running main.py directly
 ROOT = Path(__file__).parent.resolve()
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from ui.app_window import MochaCodespace
 
 def main():
+    # Imported here rather than at module level: spawned highlighting workers
+    # re-import this module and must not load Qt or the UI.
+    from qt_compat import QApplication, USING_PYQT
+    from ui.app_window import MochaCodespace
+
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
 
@@ -21,4 +24,6 @@ def main():
     sys.exit(app.exec() if USING_PYQT else app.exec())
 
 if __name__ == "__main__":
+    # Highlighting worker processes must not re-launch the GUI in frozen builds
+    multiprocessing.freeze_support()
     main()
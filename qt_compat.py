@@ -7,11 +7,13 @@ try:
         QTextEdit, QPlainTextEdit, QPushButton, QLabel, QComboBox,
         QFileDialog, QMessageBox, QInputDialog, QSplitter, QTreeWidget,
         QTreeWidgetItem, QTabWidget, QToolBar, QStatusBar, QMenuBar, QMenu,
-        QCompleter, QListWidget
+        QCompleter, QListWidget, QTreeView, QStyle
     )
-    from PyQt6.QtCore import Qt, QTimer, pyqtSignal as Signal, QThread, QStringListModel, QRect
+    from PyQt6.QtCore import (Qt, QTimer, pyqtSignal as Signal, pyqtSlot as Slot, QThread,
+                              QStringListModel, QRect, QModelIndex, QSortFilterProxyModel)
     from PyQt6.QtGui import (QFont, QTextCharFormat, QColor, QTextCursor, QKeySequence,
-                             QAction, QSyntaxHighlighter, QPalette)
+                             QAction, QSyntaxHighlighter, QPalette, QFontDatabase, QFileSystemModel,
+                             QTextBlockUserData)
     USING_PYQT = True
 except Exception:
     # PySide6 fallback
@@ -20,11 +22,13 @@ except Exception:
         QTextEdit, QPlainTextEdit, QPushButton, QLabel, QComboBox,
         QFileDialog, QMessageBox, QInputDialog, QSplitter, QTreeWidget,
         QTreeWidgetItem, QTabWidget, QToolBar, QStatusBar, QMenuBar, QMenu,
-        QCompleter, QListWidget
+        QCompleter, QListWidget, QTreeView, QStyle
     )
-    from PySide6.QtCore import Qt, QTimer, Signal, QThread, QStringListModel, QRect
+    from PySide6.QtCore import (Qt, QTimer, Signal, Slot, QThread, QStringListModel, QRect,
+                                QModelIndex, QSortFilterProxyModel)
     from PySide6.QtGui import (QFont, QTextCharFormat, QColor, QTextCursor, QKeySequence,
-                               QAction, QSyntaxHighlighter, QPalette)
+                               QAction, QSyntaxHighlighter, QPalette, QFontDatabase, QFileSystemModel,
+                               QTextBlockUserData)
     USING_PYQT = False
 
 # Exported names: modules can import like `from qt_compat import QApplication, Qt, QThread, ...`
@@ -33,7 +37,8 @@ __all__ = [
     "QTextEdit", "QPlainTextEdit", "QPushButton", "QLabel", "QComboBox",
     "QFileDialog", "QMessageBox", "QInputDialog", "QSplitter", "QTreeWidget",
     "QTreeWidgetItem", "QTabWidget", "QToolBar", "QStatusBar", "QMenuBar", "QMenu",
-    "QCompleter", "QListWidget", "Qt", "QTimer", "Signal", "QThread", "QStringListModel",
-    "QRect", "QFont", "QTextCharFormat", "QColor", "QTextCursor", "QKeySequence",
-    "QAction", "QSyntaxHighlighter", "QPalette", "USING_PYQT"
+    "QCompleter", "QListWidget", "QTreeView", "QStyle", "Qt", "QTimer", "Signal", "Slot", "QThread",
+    "QStringListModel", "QRect", "QModelIndex", "QSortFilterProxyModel", "QFont", "QTextCharFormat",
+    "QColor", "QTextCursor", "QKeySequence", "QAction", "QSyntaxHighlighter", "QPalette",
+    "QFontDatabase", "QFileSystemModel", "QTextBlockUserData", "USING_PYQT"
 ]
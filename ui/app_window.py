@@ -1,17 +1,63 @@
+import functools
 import subprocess
 import webbrowser
 from pathlib import Path
 
 from qt_compat import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, QTabWidget,
-    QTextEdit, QLabel, QTreeWidget, QTreeWidgetItem, QToolBar, QComboBox,
-    QMessageBox, QAction, QKeySequence, QFileDialog, QStatusBar, Qt
+    QPlainTextEdit, QLabel, QTreeView, QToolBar, QComboBox,
+    QMessageBox, QAction, QKeySequence, QFileDialog, QStatusBar, Qt, QFont, QTextCursor, QTimer,
+    QModelIndex, QStyle, Slot
 )
 
 from editor import EditorTab
-from editor.runner import RunnerThread, get_run_command
+from editor.code_editor import editor_font_family
+from editor.runner import RunnerThread, forget_build, get_run_command, refresh_tool_paths
 from config.languages import LANG_CONFIG
-from utils.workspace import populate_tree
+from utils.workspace import WorkspaceModel
+
+# Toolbar labels; New/Open/Save/Run are the icon text of the shared menu actions.
+# Icons come from the style rather than emoji, which need color-font fallback
+# shaping every time the toolbar paints.
+_TB_NEW = "New"
+_TB_OPEN = "Open"
+_TB_SAVE = "Save"
+_TB_RUN = "Run"
+_TB_LANGUAGE = " Language: "
+_TB_OPEN_WORKSPACE = "Open Workspace"
+_TB_CLOSE_WORKSPACE = "Close Workspace"
+
+_UNTITLED_FMT = "untitled{}".format
+_ALL_FILES_FILTER = "All Files (*)"
+
+# Extension -> language, for detecting the language of opened files
+_EXT_TO_LANG = {cfg["ext"].lower(): lang for lang, cfg in LANG_CONFIG.items() if cfg.get("ext")}
+
+_LANG_FILE_FILTER = ";;".join(
+    [_ALL_FILES_FILTER] + [f"{lang} (*{cfg['ext']})" for lang, cfg in LANG_CONFIG.items() if cfg.get("ext")]
+)
+
+# The whole window theme, parsed once by Qt when the window is styled
+MOCHA_QSS = """
+    QMainWindow { background-color: #faf7f2; }
+    QMenuBar { background-color: #f5ebe0; color: #704241; padding: 4px; }
+    QPlainTextEdit#codeEditor {
+        background-color: #f5ebe0;
+        color: #704241;
+        selection-background-color: #e3d5ca;
+        border: none;
+        padding: 8px;
+    }
+    QLabel#consoleLabel { color: #704241; font-weight: bold; font-size: 11pt; padding: 4px; }
+    QPlainTextEdit#console {
+        background-color: #faf7f2;
+        color: #704241;
+        selection-background-color: #e3d5ca;
+        border: 1px solid #d5bdaf;
+        border-radius: 6px;
+        padding: 4px;
+    }
+"""
 
 class MochaCodespace(QMainWindow):
     def __init__(self):
@@ -21,19 +67,18 @@ class MochaCodespace(QMainWindow):
 
         self.workspace_path = None
         self.runner_thread = None
+        self.lang_combo = None
 
         self.setup_ui()
         self.create_menus()
-        self.create_toolbar()
+        # Built after the first event-loop pass so the window paints sooner
+        QTimer.singleShot(0, self.create_toolbar)
         self.create_statusbar()
 
         self.new_file()
 
     def setup_ui(self):
-        self.setStyleSheet("""
-            QMainWindow { background-color: #faf7f2; }
-            QMenuBar { background-color: #f5ebe0; color: #704241; padding: 4px; }
-        """)
+        self.setStyleSheet(MOCHA_QSS)
         central = QWidget()
         self.setCentralWidget(central)
         layout = QHBoxLayout(central)
@@ -43,11 +88,6 @@ class MochaCodespace(QMainWindow):
         self.main_splitter = QSplitter(Qt.Orientation.Horizontal)
         layout.addWidget(self.main_splitter)
 
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabel("📁 Workspace")
-        self.tree_widget.itemDoubleClicked.connect(self.on_tree_double_click)
-        self.tree_widget.hide()
-
         right_widget = QWidget()
         right_layout = QVBoxLayout(right_widget)
         right_layout.setContentsMargins(0, 0, 0, 0)
@@ -58,40 +98,82 @@ class MochaCodespace(QMainWindow):
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
         right_layout.addWidget(self.tab_widget)
 
-        console_label = QLabel("💻 Console Output:")
+        console_label = QLabel("Console Output:")
+        console_label.setObjectName("consoleLabel")
         right_layout.addWidget(console_label)
 
-        self.console = QTextEdit()
+        self.console = QPlainTextEdit()
+        self.console.setObjectName("console")
         self.console.setReadOnly(True)
+        console_font = QFont(editor_font_family(), 10)
+        console_font.setStyleHint(QFont.StyleHint.Monospace)
+        self.console.setFont(console_font)
+        # Keep long-running programs from growing the console without bound
+        self.console.setMaximumBlockCount(5000)
+        # Read-only output needs no undo history
+        self.console.setUndoRedoEnabled(False)
         self.console.setMaximumHeight(200)
+        # Writes go through one cursor kept at the end of the console
+        self._console_cursor = QTextCursor(self.console.document())
         right_layout.addWidget(self.console)
 
         self.main_splitter.addWidget(right_widget)
 
+    @functools.cached_property
+    def tree_view(self):
+        """Workspace tree, only built once a workspace is opened."""
+        self.workspace_model = WorkspaceModel(self)
+        tree_view = QTreeView()
+        tree_view.setModel(self.workspace_model)
+        # Rows are laid out from the first row's height instead of measuring
+        # each one as directories stream in from the file system model
+        tree_view.setUniformRowHeights(True)
+        # Name only; size, type and date columns are not useful in a sidebar
+        for column in range(1, self.workspace_model.columnCount()):
+            tree_view.hideColumn(column)
+        tree_view.doubleClicked.connect(self.on_tree_double_click)
+        tree_view.hide()
+        return tree_view
+
+    def _std_icon(self, pixmap):
+        return self.style().standardIcon(pixmap)
+
     def create_menus(self):
         menubar = self.menuBar()
 
         file_menu = menubar.addMenu("&File")
-        new_action = QAction("&New", self)
-        new_action.setShortcut(QKeySequence.StandardKey.New)
-        new_action.triggered.connect(self.new_file)
-        file_menu.addAction(new_action)
-
-        open_action = QAction("&Open...", self)
-        open_action.setShortcut(QKeySequence.StandardKey.Open)
-        open_action.triggered.connect(self.open_file)
-        file_menu.addAction(open_action)
-
-        save_action = QAction("&Save", self)
-        save_action.setShortcut(QKeySequence.StandardKey.Save)
-        save_action.triggered.connect(self.save_file)
-        file_menu.addAction(save_action)
+        # New/Open/Save/Run are shared with the toolbar, which shows their icon text
+        self._new_action = QAction("&New", self)
+        self._new_action.setIconText(_TB_NEW)
+        self._new_action.setIcon(self._std_icon(QStyle.StandardPixmap.SP_FileIcon))
+        self._new_action.setShortcut(QKeySequence.StandardKey.New)
+        self._new_action.triggered.connect(self.new_file)
+        file_menu.addAction(self._new_action)
+
+        self._open_action = QAction("&Open...", self)
+        self._open_action.setIconText(_TB_OPEN)
+        self._open_action.setIcon(self._std_icon(QStyle.StandardPixmap.SP_DialogOpenButton))
+        self._open_action.setShortcut(QKeySequence.StandardKey.Open)
+        self._open_action.triggered.connect(self.open_file)
+        file_menu.addAction(self._open_action)
+
+        self._save_action = QAction("&Save", self)
+        self._save_action.setIconText(_TB_SAVE)
+        self._save_action.setIcon(self._std_icon(QStyle.StandardPixmap.SP_DialogSaveButton))
+        self._save_action.setShortcut(QKeySequence.StandardKey.Save)
+        self._save_action.triggered.connect(self.save_file)
+        file_menu.addAction(self._save_action)
 
         save_as_action = QAction("Save &As...", self)
         save_as_action.setShortcut(QKeySequence.StandardKey.SaveAs)
         save_as_action.triggered.connect(self.save_file_as)
         file_menu.addAction(save_as_action)
 
+        file_menu.addSeparator()
+        refresh_tools_action = QAction("Refresh &Tool Paths", self)
+        refresh_tools_action.triggered.connect(self.refresh_tool_paths)
+        file_menu.addAction(refresh_tools_action)
+
         file_menu.addSeparator()
         exit_action = QAction("E&xit", self)
         exit_action.setShortcut(QKeySequence.StandardKey.Quit)
@@ -111,10 +193,12 @@ class MochaCodespace(QMainWindow):
         edit_menu.addAction(redo_action)
 
         run_menu = menubar.addMenu("&Run")
-        run_action = QAction("&Run", self)
-        run_action.setShortcut("F5")
-        run_action.triggered.connect(self.run_code)
-        run_menu.addAction(run_action)
+        self._run_action = QAction("&Run", self)
+        self._run_action.setIconText(_TB_RUN)
+        self._run_action.setIcon(self._std_icon(QStyle.StandardPixmap.SP_MediaPlay))
+        self._run_action.setShortcut("F5")
+        self._run_action.triggered.connect(self.run_code)
+        run_menu.addAction(self._run_action)
 
         help_menu = menubar.addMenu("&Help")
         about_action = QAction("&About", self)
@@ -124,56 +208,59 @@ class MochaCodespace(QMainWindow):
     def create_toolbar(self):
         toolbar = QToolBar()
         toolbar.setMovable(False)
+        toolbar.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
         self.addToolBar(toolbar)
 
-        toolbar.addAction("📄 New", self.new_file)
-        toolbar.addAction("📂 Open", self.open_file)
-        toolbar.addAction("💾 Save", self.save_file)
+        toolbar.addAction(self._new_action)
+        toolbar.addAction(self._open_action)
+        toolbar.addAction(self._save_action)
         toolbar.addSeparator()
 
-        lang_label = QLabel(" 🔤 Language: ")
+        lang_label = QLabel(_TB_LANGUAGE)
         toolbar.addWidget(lang_label)
         self.lang_combo = QComboBox()
         self.lang_combo.addItems(list(LANG_CONFIG.keys()))
         self.lang_combo.currentTextChanged.connect(self.on_language_changed)
         toolbar.addWidget(self.lang_combo)
         toolbar.addSeparator()
-        toolbar.addAction("▶️ Run", self.run_code)
+        toolbar.addAction(self._run_action)
         toolbar.addSeparator()
-        toolbar.addAction("📁 Open Workspace", self.open_workspace)
-        toolbar.addAction("❌ Close Workspace", self.close_workspace)
+        open_workspace_action = QAction(self._std_icon(QStyle.StandardPixmap.SP_DirOpenIcon),
+                                        _TB_OPEN_WORKSPACE, self)
+        open_workspace_action.triggered.connect(self.open_workspace)
+        toolbar.addAction(open_workspace_action)
+        close_workspace_action = QAction(self._std_icon(QStyle.StandardPixmap.SP_DialogCloseButton),
+                                         _TB_CLOSE_WORKSPACE, self)
+        close_workspace_action.triggered.connect(self.close_workspace)
+        toolbar.addAction(close_workspace_action)
 
     def create_statusbar(self):
         self.statusBar().showMessage("Ready")
 
+    @Slot()
     def new_file(self):
-        language = self.lang_combo.currentText()
+        language = self.lang_combo.currentText() if self.lang_combo is not None else ""
         if not language:
             language = "Python"
         tab = EditorTab(language=language)
-        ext = LANG_CONFIG.get(language, {}).get("ext", "")
-        title = f"untitled{ext}"
-        idx = self.tab_widget.addTab(tab, title)
+        idx = self.tab_widget.addTab(tab, _UNTITLED_FMT(tab.ext))
         self.tab_widget.setCurrentIndex(idx)
         self.statusBar().showMessage(f"New {language} file created")
 
+    @Slot()
     def open_file(self, filepath=None):
         if not filepath:
-            filepath, _ = QFileDialog.getOpenFileName(self, "Open File", "", "All Files (*)")
+            filepath, _ = QFileDialog.getOpenFileName(self, "Open File", "", _LANG_FILE_FILTER)
         if not filepath:
             return
-        path = Path(filepath)
-        ext = path.suffix.lower()
-        language = "Python"
-        for lang, cfg in LANG_CONFIG.items():
-            if cfg.get("ext") == ext:
-                language = lang
-                break
+        path = filepath if isinstance(filepath, Path) else Path(filepath)
+        language = _EXT_TO_LANG.get(path.suffix.lower(), "Python")
         tab = EditorTab(language=language, filepath=path)
         idx = self.tab_widget.addTab(tab, path.name)
         self.tab_widget.setCurrentIndex(idx)
         self.statusBar().showMessage(f"Opened {path}")
 
+    @Slot()
     def save_file(self):
         tab = self.get_current_tab()
         if not tab:
@@ -181,21 +268,24 @@ class MochaCodespace(QMainWindow):
         if not tab.filepath:
             return self.save_file_as()
         if tab.save():
+            forget_build(tab.filepath)
             self.tab_widget.setTabText(self.tab_widget.currentIndex(), tab.filepath.name)
             self.statusBar().showMessage(f"Saved {tab.filepath}")
-            self.console.append(f"Saved: {tab.filepath}\n")
+            self._log_line(f"Saved: {tab.filepath}\n")
 
+    @Slot()
     def save_file_as(self):
         tab = self.get_current_tab()
         if not tab:
             return
-        ext = LANG_CONFIG.get(tab.language, {}).get("ext", "")
-        filepath, _ = QFileDialog.getSaveFileName(self, "Save File As", f"untitled{ext}", "All Files (*)")
+        filepath, _ = QFileDialog.getSaveFileName(self, "Save File As", _UNTITLED_FMT(tab.ext), _ALL_FILES_FILTER)
         if filepath and tab.save(filepath):
+            forget_build(tab.filepath)
             self.tab_widget.setTabText(self.tab_widget.currentIndex(), tab.filepath.name)
             self.statusBar().showMessage(f"Saved as {tab.filepath}")
-            self.console.append(f"Saved as: {tab.filepath}\n")
+            self._log_line(f"Saved as: {tab.filepath}\n")
 
+    @Slot(int)
     def close_tab(self, index):
         if self.tab_widget.count() > 1:
             self.tab_widget.removeTab(index)
@@ -206,23 +296,31 @@ class MochaCodespace(QMainWindow):
         widget = self.tab_widget.currentWidget()
         return widget if isinstance(widget, EditorTab) else None
 
+    @Slot(str)
     def on_language_changed(self, language):
         tab = self.get_current_tab()
         if tab and not tab.filepath:
-            tab.language = language
-            tab.editor.set_language(language)
+            tab.set_language(language)
             tab.load_content()
 
+    @Slot()
+    def refresh_tool_paths(self):
+        refresh_tool_paths()
+        self.statusBar().showMessage("Tool paths refreshed")
+
+    @Slot()
     def undo(self):
         tab = self.get_current_tab()
         if tab:
             tab.editor.undo()
 
+    @Slot()
     def redo(self):
         tab = self.get_current_tab()
         if tab:
             tab.editor.redo()
 
+    @Slot()
     def run_code(self):
         tab = self.get_current_tab()
         if not tab:
@@ -237,55 +335,82 @@ class MochaCodespace(QMainWindow):
         if not tab.filepath:
             return
 
+        filepath = tab.filepath
         self.console.clear()
-        self.console.append(f"Running {tab.filepath.name} ({tab.language})...\n")
+        self._console_cursor = QTextCursor(self.console.document())
+        self._log_line(f"Running {filepath.name} ({tab.language})...\n")
         self.statusBar().showMessage("Running...")
 
-        cfg = LANG_CONFIG.get(tab.language, {})
-        runner = cfg.get("runner")
         try:
-            command = get_run_command(tab.filepath, tab.language, runner)
+            stages = get_run_command(filepath, tab.language, tab.runner)
         except RuntimeError as e:
-            self.console.append(str(e) + "\n")
+            self._log_line(str(e) + "\n")
             self.statusBar().showMessage("Ready")
             return
 
-        if command is None:
+        if not stages:
             # runner handled (like opening in browser) or fallback
             self.statusBar().showMessage("Ready")
             return
 
-        self.runner_thread = RunnerThread(command, str(tab.filepath.parent))
-        self.runner_thread.output.connect(self.console.append)
-        self.runner_thread.finished.connect(lambda: self.statusBar().showMessage("Ready"))
+        # Compilation happens on the runner thread too, so the UI stays live
+        self.runner_thread = RunnerThread(stages, str(filepath.parent))
+        self.runner_thread.output.connect(self._log)
+        self.runner_thread.finished.connect(self._on_runner_finished)
         self.runner_thread.start()
 
+    @Slot()
+    def _on_runner_finished(self):
+        self.statusBar().showMessage("Ready")
+
+    @Slot(str)
+    def _log(self, text):
+        """Append text to the console as-is; runner output arrives in arbitrary chunks."""
+        cursor = self._console_cursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.console.setTextCursor(cursor)
+        self.console.ensureCursorVisible()
+
+    def _log_line(self, message):
+        """Append message to the console, starting it on a line of its own."""
+        cursor = self._console_cursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not cursor.atBlockStart():
+            cursor.insertBlock()
+        self._log(message)
+
+    @Slot()
     def open_workspace(self):
         folder = QFileDialog.getExistingDirectory(self, "Open Workspace")
         if not folder:
             return
         self.workspace_path = Path(folder)
-        if not self.tree_widget.isVisible():
-            self.main_splitter.insertWidget(0, self.tree_widget)
-            self.tree_widget.show()
+        if not self.tree_view.isVisible():
+            self.main_splitter.insertWidget(0, self.tree_view)
+            self.tree_view.show()
             self.main_splitter.setSizes([250, 950])
-        self.tree_widget.clear()
-        populate_tree(self.workspace_path, self.tree_widget)
+        # Switching roots resets the model; repaint once when it has settled
+        self.tree_view.setUpdatesEnabled(False)
+        try:
+            self.tree_view.setRootIndex(self.workspace_model.set_root(self.workspace_path))
+        finally:
+            self.tree_view.setUpdatesEnabled(True)
         self.statusBar().showMessage(f"Opened workspace: {self.workspace_path}")
 
-    def on_tree_double_click(self, item, column):
-        filepath = item.data(0, Qt.ItemDataRole.UserRole)
-        if filepath:
-            path = Path(filepath)
-            if path.is_file():
-                self.open_file(str(path))
+    @Slot(QModelIndex)
+    def on_tree_double_click(self, index):
+        if not self.workspace_model.is_dir(index):
+            self.open_file(self.workspace_model.file_path(index))
 
+    @Slot()
     def close_workspace(self):
         if self.workspace_path:
-            self.tree_widget.hide()
+            self.tree_view.hide()
             self.workspace_path = None
             self.statusBar().showMessage("Workspace closed")
 
+    @Slot()
     def show_about(self):
         QMessageBox.about(
             self,
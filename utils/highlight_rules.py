@@ -0,0 +1,111 @@
+# Highlighting rules, kept free of Qt so worker processes can import them cheaply
+import re
+from types import MappingProxyType
+
+from config.keywords import LANGUAGE_KEYWORDS
+
+
+def _keyword_alternation(keywords):
+    """Build the keyword regex source, factored by first character.
+
+    Grouping by the leading character lets the engine pick the single
+    relevant branch at each position instead of trying every keyword; within
+    a group the longest keyword comes first so e.g. "background-color" wins
+    over "background".
+    """
+    by_first_char = {}
+    for word in keywords:
+        by_first_char.setdefault(word[0], []).append(word[1:])
+    branches = []
+    for first_char, rests in sorted(by_first_char.items()):
+        rests = sorted(rests, key=len, reverse=True)
+        branches.append(re.escape(first_char) + '(?:' + '|'.join(map(re.escape, rests)) + ')')
+    return r'\b(?:' + '|'.join(branches) + r')\b'
+
+
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"|' + r"'[^'\\]*(?:\\.[^'\\]*)*'"
+_NUMBER = r'\b\d+\.?\d*\b'
+_FUNCTION = r'\b[A-Za-z_][A-Za-z0-9_]*(?=\()'
+_HASH_COMMENT = r'#[^\n]*'
+_LUA_COMMENT = r'--[^\n]*'
+_LINE_COMMENT = r'//[^\n]*'
+_BLOCK_COMMENT = r'/\*.*?\*/'
+_HTML_COMMENT = r'<!--.*?-->'
+
+_C_STYLE_COMMENTS = (_LINE_COMMENT, _BLOCK_COMMENT)
+
+# Comment patterns per language
+COMMENT_RULES = MappingProxyType({
+    "Python": (_HASH_COMMENT,),
+    "Ruby": (_HASH_COMMENT,),
+    "Nix": (_HASH_COMMENT,),
+    "Lua": (_LUA_COMMENT,),
+    "C": _C_STYLE_COMMENTS,
+    "C++": _C_STYLE_COMMENTS,
+    "Java": _C_STYLE_COMMENTS,
+    "JavaScript": _C_STYLE_COMMENTS,
+    "TypeScript": _C_STYLE_COMMENTS,
+    "Rust": _C_STYLE_COMMENTS,
+    "Go": _C_STYLE_COMMENTS,
+    "C#": _C_STYLE_COMMENTS,
+    "Kotlin": _C_STYLE_COMMENTS,
+    "HTML": (_HTML_COMMENT,),
+    "CSS": (_BLOCK_COMMENT,),
+})
+
+
+def fused_pattern(language):
+    """Return one compiled regex covering every highlighting rule of a language.
+
+    Each rule is a named group whose name is the format kind it gets, so a
+    single finditer pass classifies the whole block. Alternation order is the
+    precedence: comments and strings come first so keywords inside them are
+    not highlighted, and functions beat keywords so `print(` reads as a call.
+    """
+    pattern = _FUSED_BY_LANG.get(language)
+    if pattern is not None:
+        return pattern
+
+    rules = []
+    comments = COMMENT_RULES.get(language)
+    if comments:
+        rules.append(("comment", "|".join(comments)))
+    rules.append(("string", _STRING))
+    rules.append(("function", _FUNCTION))
+    keywords = LANGUAGE_KEYWORDS.get(language)
+    if keywords:
+        rules.append(("keyword", _keyword_alternation(keywords)))
+    rules.append(("number", _NUMBER))
+
+    pattern = re.compile("|".join(f"(?P<{kind}>{source})" for kind, source in rules),
+                         re.ASCII | re.DOTALL)
+    _FUSED_BY_LANG[language] = pattern
+    return pattern
+
+
+_FUSED_BY_LANG = {}
+
+
+def compute_ranges(language, text):
+    """Return [(start, length, kind), ...] for one block of text.
+
+    Kinds name a format ("keyword", "string", ...) rather than holding a
+    QTextCharFormat so results can cross process boundaries. Touching spans
+    of the same kind are merged so each run costs a single setFormat call.
+    """
+    ranges = []
+    for m in fused_pattern(language).finditer(text):
+        start, end = m.span()
+        kind = m.lastgroup
+        if ranges:
+            last_start, last_length, last_kind = ranges[-1]
+            if last_kind == kind and last_start + last_length == start:
+                ranges[-1] = (last_start, end - last_start, kind)
+                continue
+        ranges.append((start, end - start, kind))
+    return ranges
+
+
+def highlight_batch(keys):
+    """compute_ranges for a list of (language, text) keys; runs in worker processes."""
+    return [compute_ranges(language, text) for language, text in keys]
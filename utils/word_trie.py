@@ -0,0 +1,66 @@
+import heapq
+
+# Marks the set of words ending at a node; never a valid character key
+_END = ""
+
+
+class WordTrie:
+    """Case-insensitive prefix tree of words, used for autocompletion"""
+    __slots__ = ("_root",)
+
+    def __init__(self, words=()):
+        self._root = {}
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self._root
+        for ch in word.lower():
+            node = node.setdefault(ch, {})
+        node.setdefault(_END, set()).add(word)
+
+    def remove(self, word):
+        path = []
+        node = self._root
+        for ch in word.lower():
+            child = node.get(ch)
+            if child is None:
+                return
+            path.append((node, ch))
+            node = child
+
+        words = node.get(_END)
+        if not words or word not in words:
+            return
+        words.discard(word)
+        if not words:
+            del node[_END]
+        # Prune branches that no longer lead to any word
+        for parent, ch in reversed(path):
+            if parent[ch]:
+                break
+            del parent[ch]
+
+    def iter_prefix(self, prefix):
+        """Yield words starting with prefix (case-insensitive), in sorted order."""
+        node = self._root
+        for ch in prefix.lower():
+            node = node.get(ch)
+            if node is None:
+                return
+        yield from self._walk(node)
+
+    def _walk(self, node):
+        yield from sorted(node.get(_END, ()))
+        for ch in sorted(node):
+            if ch != _END:
+                yield from self._walk(node[ch])
+
+
+def merge_prefix(tries, prefix):
+    """Yield the sorted, de-duplicated union of several tries' prefix matches."""
+    seen = set()
+    for word in heapq.merge(*(trie.iter_prefix(prefix) for trie in tries), key=str.lower):
+        if word not in seen:
+            seen.add(word)
+            yield word
@@ -1,38 +1,49 @@
 from pathlib import Path
-from qt_compat import QTreeWidgetItem, Qt
+from qt_compat import QFileSystemModel, QSortFilterProxyModel, Qt
 
-def populate_tree(path: Path, tree_widget, max_depth=3, current_depth=0):
+# Build output, dependency and tool directories hidden from the workspace tree
+_SKIP_DIRS = frozenset({
+    '__pycache__', 'node_modules', 'target', 'build', 'dist',
+    '.git', '.venv', 'venv', '.idea', '.vscode',
+})
+
+
+class WorkspaceModel(QSortFilterProxyModel):
     """
-    Populate a QTreeWidget with files/folders from path.
-    `tree_widget` can be either the QTreeWidget itself (parent=None) or a QTreeWidgetItem parent.
+    File system model of a workspace folder for a QTreeView.
+    Wraps QFileSystemModel, which lists directories lazily off the GUI thread and
+    follows changes on disk, and hides dotfiles and build/dependency directories.
     """
-    if current_depth > max_depth:
-        return
-
-    try:
-        entries = sorted(path.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
-    except PermissionError:
-        return
-
-    for entry in entries:
-        if entry.name.startswith('.'):
-            continue
-        if entry.name in ('__pycache__', 'node_modules', 'target', 'build', 'dist'):
-            continue
-
-        display_name = entry.name + ("/" if entry.is_dir() else "")
-
-        if isinstance(tree_widget, type(tree_widget)):  # tree_widget is a QTreeWidget
-            parent_item = QTreeWidgetItem(tree_widget, [display_name])
-        else:
-            # assume QTreeWidgetItem passed as parent
-            parent_item = QTreeWidgetItem(tree_widget, [display_name])
-
-        parent_item.setData(0, Qt.ItemDataRole.UserRole, str(entry))
-
-        if entry.is_dir():
-            try:
-                populate_tree(entry, parent_item, max_depth, current_depth + 1)
-            except Exception:
-                # ignore permission errors on recursion
-                pass
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fs_model = QFileSystemModel(self)
+        self.setSourceModel(self.fs_model)
+        self._root_prefix = None
+
+    def set_root(self, path: Path):
+        """Show the contents of path; returns the proxy index to use as the view's root."""
+        root = Path(path).as_posix()
+        self._root_prefix = root.rstrip('/') + '/'
+        source_root = self.fs_model.setRootPath(root)
+        self.invalidateFilter()
+        return self.mapFromSource(source_root)
+
+    def file_path(self, index) -> Path:
+        return Path(self.fs_model.filePath(self.mapToSource(index)))
+
+    def is_dir(self, index):
+        return self.fs_model.isDir(self.mapToSource(index))
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.fs_model.index(source_row, 0, source_parent)
+        name = self.fs_model.fileName(index)
+        if not (name.startswith('.') or (name in _SKIP_DIRS and self.fs_model.isDir(index))):
+            return True
+        # Only filter inside the workspace; the root's ancestors must stay reachable
+        return self._root_prefix is None or not self.fs_model.filePath(index).startswith(self._root_prefix)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if section == 0 and orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return "Workspace"
+        return super().headerData(section, orientation, role)